@@ -0,0 +1,18 @@
+class JinjaCraftError(Exception):
+    """Base class for JinjaCraft errors"""
+
+
+class DataFileError(JinjaCraftError):
+    """Yaml data file cannot be read or parsed"""
+
+
+class TemplateFileError(JinjaCraftError):
+    """Jinja2 template file cannot be read"""
+
+
+class TemplateRenderError(JinjaCraftError):
+    """Jinja2 template cannot be compiled or rendered"""
+
+
+class OutputFileError(JinjaCraftError):
+    """Output file cannot be written"""
@@ -1,20 +1,58 @@
-import argparse
-from jinjacraft.renderer import TemplateRenderer
+import sys
+from typing import Dict, List, Optional
+
+
+def _parse_args_fast(argv: List[str]) -> Optional[Dict[str, Optional[str]]]:
+    """Parses the common command line without importing argparse
+    Only handles the two positional arguments and -o/--output_file, anything else
+    (help, unknown options, missing arguments) returns None and is left to argparse.
+
+    Args:
+        argv (list):    Command line arguments, without the program name
+
+    Returns: Parsed arguments or None
+    """
+    positionals = []
+    output_file = None
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-o", "--output_file"):
+            output_file = next(args, None)
+            if output_file is None or output_file.startswith("-"):
+                return None
+        elif arg.startswith("--output_file="):
+            output_file = arg[len("--output_file="):]
+        elif arg.startswith("-"):
+            return None
+        else:
+            positionals.append(arg)
+    if len(positionals) != 2:
+        return None
+    return {"data_file": positionals[0], "template_file": positionals[1], "output_file": output_file}
 
 
 def main():
     """Main routine"""
-    # Configure the argument parser
-    parser = argparse.ArgumentParser()
-    parser.add_argument("data_file", help="Yaml data file path")
-    parser.add_argument("template_file", help="Jinja2 template file path")
-    parser.add_argument("-o", "--output_file", help="Output file path", required=False)
+    # Parse command line args, falling back to argparse for help and error reporting
+    args = _parse_args_fast(sys.argv[1:])
+    if args is None:
+        import argparse
 
-    # Parse command line args
-    args = parser.parse_args()
+        # Configure the argument parser
+        parser = argparse.ArgumentParser()
+        parser.add_argument("data_file", help="Yaml data file path")
+        parser.add_argument("template_file", help="Jinja2 template file path")
+        parser.add_argument("-o", "--output_file", help="Output file path", required=False)
+        args = vars(parser.parse_args())
 
-    # Render the template using YAML data
-    TemplateRenderer.render(data_file=args.data_file, template_file=args.template_file, output_file=args.output_file)
+    # Render the template using YAML data (deferred import: --help does not load jinja2 and yaml)
+    from jinjacraft.exceptions import JinjaCraftError
+    from jinjacraft.renderer import TemplateRenderer
+    try:
+        TemplateRenderer.render(data_file=args["data_file"], template_file=args["template_file"],
+                                output_file=args["output_file"])
+    except JinjaCraftError as err:
+        sys.exit(err)
 
 
 if __name__ == "__main__":
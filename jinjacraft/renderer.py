@@ -1,87 +1,262 @@
-from typing import Any
+import os
+import secrets
+import stat
+import sys
+from typing import Any, BinaryIO, Callable, Optional, Tuple, Type
 import yaml
 import jinja2
+from jinjacraft.exceptions import DataFileError, JinjaCraftError, OutputFileError, TemplateFileError, TemplateRenderError
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-class TemplateRenderer:
-    """Jinja2 template renderer using Yaml data file"""
 
-    @classmethod
-    def __load_data(cls, data_file: str) -> Any:
-        """Loads data from YAML file
+def _open_binary(path: str, error: Type[JinjaCraftError]) -> BinaryIO:
+    """Opens a file for reading in binary mode
+
+    Args:
+        path (str):     File path
+        error (type):   JinjaCraftError subclass raised if the file cannot be opened
+
+    Returns: Binary file object
+    """
+    try:
+        return open(path, "rb")
+    except OSError as err:
+        raise error(str(err)) from err
+
+
+def _load_template_source(template_file: str) -> Tuple[str, str, Optional[Callable[[], bool]]]:
+    """Loads Jinja2 template file for the shared environment
+
+    Args:
+        template_file (str): Jinja2 template file path
+
+    Returns: Template source, template file path and up-to-date check
+
+    Raises:
+        TemplateFileError:  Template file cannot be read
+    """
+    with _open_binary(template_file, TemplateFileError) as file:
+        file_stat = os.fstat(file.fileno())
+        try:
+            source = file.read().decode("utf-8")
+        except UnicodeDecodeError as err:
+            raise TemplateFileError(f"{template_file}: {err}") from err
+
+    def uptodate() -> bool:
+        """Cached template is reused as long as the file modification time and size are unchanged"""
+        try:
+            current = os.stat(template_file)
+        except OSError:
+            return False
+        return (current.st_mtime_ns, current.st_size) == (file_stat.st_mtime_ns, file_stat.st_size)
+
+    return source, template_file, uptodate
+
 
-        Args:
-            data_file (str):    Yaml data file path
+class _BytecodeCache(jinja2.FileSystemBytecodeCache):
+    """Persistent bytecode cache in the per-user Jinja2 cache directory
+    The directory is only created when the first template is compiled, and failures to read
+    or write the cache are ignored so that they never fail a render.
+    """
 
-        Returns: Parsed yaml data
-        """
+    def __init__(self) -> None:
+        # The parent constructor would resolve (and create) the directory right away
+        self.pattern = "__jinja2_%s.cache"
+        self.__directory: Optional[str] = None
+
+    @property
+    def directory(self) -> str:
+        """Per-user cache directory, created on first use"""
+        if self.__directory is None:
+            self.__directory = self._get_default_cache_dir()
+        return self.__directory
+
+    def load_bytecode(self, bucket: jinja2.bccache.Bucket) -> None:
+        try:
+            super().load_bytecode(bucket)
+        except (OSError, RuntimeError):
+            pass
+
+    def dump_bytecode(self, bucket: jinja2.bccache.Bucket) -> None:
         try:
-            with open(data_file) as file:
-                return yaml.load(file, Loader=yaml.Loader)
-        except PermissionError as err:
-            exit(err)
-        except FileNotFoundError as err:
-            exit(err)
-
-    @classmethod
-    def __load_template(cls, template_file: str) -> str:
-        """Loads Jinja2 template file
-
-        Args:
-            template_file (str): Jinja2 template file path
-
-        Returns: Jinja2 template
-        """
+            super().dump_bytecode(bucket)
+        except (OSError, RuntimeError):
+            pass
+
+
+# Shared environment, templates are compiled once and cached by absolute path
+# until the file modification time or size changes.
+# Compiled bytecode is also persisted in the per-user Jinja2 cache directory so
+# later invocations skip the compile step.
+_ENV = jinja2.Environment(
+    loader=jinja2.FunctionLoader(_load_template_source),
+    bytecode_cache=_BytecodeCache(),
+    auto_reload=True,
+    cache_size=400,
+)
+
+# Rendered output is streamed in small chunks, buffer them into large writes
+_OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
+def _load_data(data_file: str) -> Any:
+    """Loads data from YAML file
+
+    Args:
+        data_file (str):    Yaml data file path
+
+    Returns: Parsed yaml data
+
+    Raises:
+        DataFileError:  Data file cannot be read or is not valid YAML
+    """
+    with _open_binary(data_file, DataFileError) as file:
         try:
-            with open(template_file) as file:
-                return file.read()
-        except FileNotFoundError as err:
-            exit(err)
-        except PermissionError as err:
-            exit(err)
-
-    @classmethod
-    def __write_output(cls, content: str, output_file: str) -> None:
-        """Writes rendered template to file
-
-        Args:
-            content (str):  rendered templated
-            output_file (str): output file path
-        """
+            return yaml.load(file, Loader=_YamlLoader)
+        except yaml.YAMLError as err:
+            raise DataFileError(str(err)) from err
+
+
+def _write_output(content: jinja2.environment.TemplateStream, output_file: str) -> None:
+    """Writes rendered template to file, chunk by chunk
+    A regular output file is only replaced once rendering succeeded: the template is streamed into
+    a temporary file next to it, which is then renamed over it. Other outputs (FIFOs, devices,
+    hard-linked or foreign-owned files, read-only directories) are written in place.
+
+    Args:
+        content (TemplateStream):   rendered template stream
+        output_file (str): output file path
+
+    Raises:
+        OutputFileError:    Output file cannot be written
+    """
+    try:
+        output_stat = os.stat(output_file)
+    except FileNotFoundError:
+        output_stat = None
+    except OSError as err:
+        raise OutputFileError(str(err)) from err
+
+    if output_stat is None or _is_replaceable(output_stat):
+        temp_file = _create_temp_output(output_file, output_stat)
+        if temp_file is not None:
+            _replace_output(content, temp_file, output_file)
+            return
+
+    try:
+        with open(output_file, "w", encoding="utf-8", buffering=_OUTPUT_BUFFER_SIZE) as file:
+            content.dump(file)
+    except OSError as err:
+        raise OutputFileError(str(err)) from err
+
+
+def _is_replaceable(output_stat: os.stat_result) -> bool:
+    """Checks whether the output file can be swapped for a new file without visible side effects
+
+    Args:
+        output_stat (stat_result):  output file status
+
+    Returns: True for a regular, single-linked file owned by the current user and group
+    """
+    if not stat.S_ISREG(output_stat.st_mode) or output_stat.st_nlink != 1:
+        return False
+    if hasattr(os, "geteuid"):
+        return (output_stat.st_uid, output_stat.st_gid) == (os.geteuid(), os.getegid())
+    return True
+
+
+def _create_temp_output(output_file: str, output_stat: Optional[os.stat_result]) -> Optional[str]:
+    """Creates an empty temporary file next to the output file
+    New files get the default permissions (the kernel applies the umask), replaced files keep
+    the permissions of the file they replace.
+
+    Args:
+        output_file (str):                  output file path
+        output_stat (stat_result or None):  output file status, None if it does not exist yet
+
+    Returns: Temporary file path, or None if it cannot be created
+    """
+    target = os.path.realpath(output_file)
+    temp_file = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{secrets.token_hex(8)}.tmp")
+    try:
+        os.close(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666))
+    except OSError:
+        return None
+    if output_stat is not None:
         try:
-            with open(output_file, "w") as file:
-                file.write(content)
-        except PermissionError as err:
-            exit(err)
-
-    @classmethod
-    def __display(cls, content: str) -> None:
-        """Display rendered template to the terminal
-
-        Args:
-            content (str):  rendered templated
-        """
-        print(content)
-
-    @classmethod
-    def render(cls, data_file: str, template_file: str, output_file: str or None = None):
-        """Render the Jinja2 template using the YAML data file
-        If output_file is None, prints the result to the terminal, otherwise write to the output file.
-
-        Args:
-            data_file (str):            Yaml data file path
-            template_file (str):        Jinja2 template file path
-            output_file (str or None):  Output file path
-        """
-        data = cls.__load_data(data_file)
-        template = cls.__load_template(template_file)
-        environment = jinja2.Environment()
+            os.chmod(temp_file, stat.S_IMODE(output_stat.st_mode))
+        except OSError:
+            os.unlink(temp_file)
+            return None
+    return temp_file
+
+
+def _replace_output(content: jinja2.environment.TemplateStream, temp_file: str, output_file: str) -> None:
+    """Streams the rendered template into the temporary file, then renames it over the output file
+    The temporary file is removed if anything fails, leaving the output file untouched.
+
+    Args:
+        content (TemplateStream):   rendered template stream
+        temp_file (str):    temporary file path
+        output_file (str):  output file path
+
+    Raises:
+        OutputFileError:    Output file cannot be written
+    """
+    try:
+        with open(temp_file, "w", encoding="utf-8", buffering=_OUTPUT_BUFFER_SIZE) as file:
+            content.dump(file)
+        os.replace(temp_file, os.path.realpath(output_file))
+    except BaseException as err:
         try:
-            jinja2_template = environment.from_string(template)
-            result = jinja2_template.render(data)
-            if output_file is None:
-                cls.__display(result)
-            else:
-                cls.__write_output(content=result, output_file=output_file)
-        except jinja2.exceptions.TemplateError as err:
-            exit(err)
+            os.unlink(temp_file)
+        except OSError:
+            pass
+        if isinstance(err, OSError):
+            raise OutputFileError(str(err)) from err
+        raise
+
+
+def _display(content: jinja2.environment.TemplateStream) -> None:
+    """Display rendered template to the terminal, chunk by chunk
+
+    Args:
+        content (TemplateStream):   rendered template stream
+    """
+    content.dump(sys.stdout)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def render(data_file: str, template_file: str, output_file: Optional[str] = None) -> None:
+    """Render the Jinja2 template using the YAML data file
+    If output_file is None, prints the result to the terminal, otherwise write to the output file.
+
+    Args:
+        data_file (str):            Yaml data file path
+        template_file (str):        Jinja2 template file path
+        output_file (str, optional): Output file path
+
+    Raises:
+        JinjaCraftError:    Data, template or output file error
+    """
+    data = _load_data(data_file)
+    try:
+        jinja2_template = _ENV.get_template(os.path.abspath(template_file))
+        result = jinja2_template.stream(data)
+        if output_file is None:
+            _display(result)
+        else:
+            _write_output(content=result, output_file=output_file)
+    except jinja2.exceptions.TemplateError as err:
+        raise TemplateRenderError(str(err)) from err
+
+
+class TemplateRenderer:
+    """Jinja2 template renderer using Yaml data file"""
+
+    render = staticmethod(render)
@@ -1,3 +1,10 @@
+import os
+import stat
+import threading
+import pytest
+from jinjacraft.main import _parse_args_fast
+from jinjacraft.exceptions import DataFileError, OutputFileError, TemplateFileError, TemplateRenderError
+from jinjacraft import renderer
 from jinjacraft.renderer import TemplateRenderer
 
 
@@ -16,3 +23,118 @@ def test_renderer():
 
     assert result == awaited_result
 
+
+def test_fast_argument_parser():
+    assert _parse_args_fast(["data.yaml", "template.jinja2", "-o", "out.txt"]) == {
+        "data_file": "data.yaml", "template_file": "template.jinja2", "output_file": "out.txt"}
+    assert _parse_args_fast(["--output_file=out.txt", "data.yaml", "template.jinja2"])["output_file"] == "out.txt"
+    assert _parse_args_fast(["data.yaml", "template.jinja2"])["output_file"] is None
+    assert _parse_args_fast(["-h"]) is None
+    assert _parse_args_fast(["data.yaml"]) is None
+    assert _parse_args_fast(["data.yaml", "template.jinja2", "-o"]) is None
+
+
+def test_renderer_reloads_modified_template(tmp_path):
+    data_file = "tests/data.yaml"
+    template_file = tmp_path / "template.jinja2"
+    output_file = tmp_path / "output.txt"
+
+    template_file.write_text("{{ title }}")
+    TemplateRenderer.render(data_file, str(template_file), str(output_file))
+    assert output_file.read_text() == "Hello World"
+
+    template_file.write_text("Title: {{ title }}")
+    TemplateRenderer.render(data_file, str(template_file), str(output_file))
+    assert output_file.read_text() == "Title: Hello World"
+
+
+def test_renderer_missing_files(tmp_path):
+    with pytest.raises(DataFileError):
+        TemplateRenderer.render("tests/missing.yaml", "tests/template.jinja2", str(tmp_path / "output.txt"))
+
+    with pytest.raises(TemplateFileError):
+        TemplateRenderer.render("tests/data.yaml", "tests/missing.jinja2", str(tmp_path / "output.txt"))
+
+
+def test_renderer_invalid_data(tmp_path):
+    data_file = tmp_path / "data.yaml"
+    data_file.write_text("tasks: [")
+
+    with pytest.raises(DataFileError):
+        TemplateRenderer.render(str(data_file), "tests/template.jinja2", str(tmp_path / "output.txt"))
+
+
+def test_renderer_template_syntax_error(tmp_path):
+    template_file = tmp_path / "template.jinja2"
+    template_file.write_text("{% if %}")
+
+    with pytest.raises(TemplateRenderError):
+        TemplateRenderer.render("tests/data.yaml", str(template_file), str(tmp_path / "output.txt"))
+
+
+def test_renderer_output_directory_missing(tmp_path):
+    with pytest.raises(OutputFileError):
+        TemplateRenderer.render("tests/data.yaml", "tests/template.jinja2", str(tmp_path / "missing" / "output.txt"))
+
+
+def test_renderer_failure_keeps_output_file(tmp_path):
+    template_file = tmp_path / "template.jinja2"
+    output_file = tmp_path / "output.txt"
+    template_file.write_text("x{{ foo.bar.baz }}")
+    output_file.write_text("KEEP")
+
+    with pytest.raises(TemplateRenderError):
+        TemplateRenderer.render("tests/data.yaml", str(template_file), str(output_file))
+
+    assert output_file.read_text() == "KEEP"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["output.txt", "template.jinja2"]
+
+
+def test_renderer_display(capsys):
+    TemplateRenderer.render("tests/data.yaml", "tests/template.jinja2")
+
+    with open("tests/reference_output.txt") as reference:
+        awaited_result = reference.read()
+
+    assert capsys.readouterr().out == awaited_result + "\n"
+
+
+def test_renderer_output_symlink(tmp_path):
+    output_file = tmp_path / "output.txt"
+    output_link = tmp_path / "link.txt"
+    output_file.write_text("KEEP")
+    output_link.symlink_to(output_file)
+    TemplateRenderer.render("tests/data.yaml", "tests/template.jinja2", str(output_link))
+
+    with open("tests/reference_output.txt") as reference:
+        awaited_result = reference.read()
+
+    assert output_link.is_symlink()
+    assert output_file.read_text() == awaited_result
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_renderer_output_fifo(tmp_path):
+    output_fifo = tmp_path / "output.fifo"
+    os.mkfifo(output_fifo)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(output_fifo.read_text()), daemon=True)
+    reader.start()
+    TemplateRenderer.render("tests/data.yaml", "tests/template.jinja2", str(output_fifo))
+    reader.join(timeout=5)
+
+    with open("tests/reference_output.txt") as reference:
+        awaited_result = reference.read()
+
+    assert stat.S_ISFIFO(os.stat(output_fifo).st_mode)
+    assert result == [awaited_result]
+
+
+def test_renderer_bytecode_cache_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(renderer._ENV.bytecode_cache, "_BytecodeCache__directory", str(tmp_path / "missing"))
+    template_file = tmp_path / "template.jinja2"
+    output_file = tmp_path / "output.txt"
+    template_file.write_text("{{ title }}")
+    TemplateRenderer.render("tests/data.yaml", str(template_file), str(output_file))
+
+    assert output_file.read_text() == "Hello World"